@@ -0,0 +1,26 @@
+"""Framework for executing actions and rollbacks.
+
+Submodules are loaded lazily on first attribute access, so that
+``import actionqueues`` stays cheap for short-lived processes. This needs
+Python 3.7+; on earlier versions import submodules explicitly, as in
+``from actionqueues import actionqueue``.
+"""
+
+_SUBMODULES = (
+    'action',
+    'actionqueue',
+    'aqstatemachine',
+    'exceptionfactory',
+    'probe',
+    'retrypolicy',
+    'timeline',
+)
+
+def __getattr__(name):
+    """Import submodules on first access."""
+    if name in _SUBMODULES:
+        return __import__(__name__ + '.' + name, fromlist=[name])
+    raise AttributeError("module 'actionqueues' has no attribute %r" % name)
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
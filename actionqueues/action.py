@@ -1,7 +1,17 @@
 """Base class for actions."""
 
 class Action(object):
-    """Base class for actions."""
+    """Base class for actions.
+
+    Actions may also define a probe method, taking no arguments, to cheaply
+    check whether a retried execute or rollback may succeed. It is called
+    after the backoff of any retry allowed by the queue's retry policy,
+    before the failed method is called again. Return to have it called
+    again. Exceptions are passed to the retry policy, with their own count
+    of retries: if it gives a backoff the queue waits and probes again,
+    otherwise the exception is treated as raised by the failed method.
+    Actions without a probe method are retried straight after the backoff.
+    """
 
     def execute(self):
         """Execute this action.
@@ -9,6 +19,8 @@ class Action(object):
         Save state on the object to allow for rollback of side-effects.
 
         Throw a ActionRetryException if a failure should be retried later.
+        The queue's retry policy may also retry other exceptions or return
+        values.
         """
         pass
 
@@ -19,3 +31,21 @@ class Action(object):
         or this action itself throws an exception.
         """
         pass
+
+    def probe_key(self):  # pylint: disable=no-self-use
+        """Return a key naming the dependency checked by probe, or None.
+
+        Actions returning the same key share successful probe results via
+        the ProbeResults object passed to their queues.
+        """
+        return None
+
+    def rollback_record(self):  # pylint: disable=no-self-use
+        """Return a compact record to roll back this action, or None.
+
+        Called after execute succeeds. If an object with a rollback method
+        is returned, the queue keeps that in place of this action, so any
+        state only needed by execute can be freed. Return None to have the
+        queue keep this action and call its rollback method.
+        """
+        return None
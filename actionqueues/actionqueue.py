@@ -11,10 +11,45 @@ class ActionRetryException(Exception):
         super(ActionRetryException, self).__init__()
         self.ms_backoff = ms_backoff
 
+class RetryPolicy(object):
+    """Decides whether the queue retries a call to an action's execute or
+    rollback method, and the backoff before doing so.
+
+    Policies are given the number of retries already made for the call
+    rather than keeping state, so one policy can be shared by any number of
+    actions and queues. This policy retries ActionRetryException with its
+    backoff; see the retrypolicy module for others.
+    """
+
+    def retry_exception(self, exception, attempt):  # pylint: disable=no-self-use,unused-argument
+        """Return the backoff in milliseconds before retrying a call which
+        raised exception, or None to fail with the exception.
+
+        attempt is the number of times the call has already been retried.
+        """
+        if isinstance(exception, ActionRetryException):
+            return exception.ms_backoff
+        return None
+
+    def retry_result(self, result, attempt):  # pylint: disable=no-self-use,unused-argument
+        """Return the backoff in milliseconds before retrying a call which
+        returned result, or None to accept it.
+
+        attempt is the number of times the call has already been retried.
+        """
+        return None
+
 class ActionQueue(object):
     """Queue of Action objects ready for execution."""
 
-    def __init__(self):
+    def __init__(self, probe_results=None, recorder=None, retry_policy=None):
+        """Initialise, optionally with a ProbeResults object shared with other
+        queues, a recorder for execution events, such as a
+        timeline.TimelineRecorder, and a RetryPolicy.
+        """
+        self._probe_results = probe_results
+        self._recorder = recorder
+        self._retry_policy = retry_policy or RetryPolicy()
         self._actions = list()
         self._executed_actions = list()
         self._state_machine = AQStateMachine()
@@ -28,34 +63,119 @@ class ActionQueue(object):
         """Execute all actions, throwing an ExecutionException on failure.
 
         Catch the ExecutionException and call rollback() to rollback.
+
+        Actions are released by the queue as they execute. If an action
+        provides a rollback record, only the record is kept for rollback.
         """
         self._state_machine.transition_to_execute()
-        for action in self._actions:
+        for index, action in enumerate(self._actions):
+            self._actions[index] = None  # the queue holds executed actions below
             self._executed_actions.append(action)
-            self.execute_with_retries(action, lambda a: a.execute())
+            self.execute_with_retries(action, lambda a: a.execute(), index=index)
+            self._executed_actions[-1] = _rollback_record_for(action)
         self._state_machine.transition_to_execute_complete()
 
     def rollback(self):
         """Call rollback on executed actions."""
         self._state_machine.transition_to_rollback()
-        for action in reversed(self._executed_actions):
+        for index in reversed(range(len(self._executed_actions))):
             try:
-                self.execute_with_retries(action, lambda a: a.rollback())
+                self.execute_with_retries(
+                    self._executed_actions[index],
+                    lambda a: a.rollback(),
+                    index=index,
+                    kind='rollback'
+                )
             except:  # pylint: disable=bare-except
                 pass  # on exception, carry on with rollback of other steps
         self._state_machine.transition_to_rollback_complete()
 
-    def execute_with_retries(self, action, f):
-        """Execute function f with single argument action. Retry if
-        ActionRetryException is raised.
+    def execute_with_retries(self, action, f, index=None, kind='execute'):
+        """Execute function f with single argument action. Retry while the
+        queue's retry policy gives a backoff for the exception raised or value
+        returned, once the action's probe succeeds.
+
+        index and kind identify the call to the queue's recorder. Calls
+        without an index, which aren't for a queued action, aren't recorded.
+        """
+        attempt = 0
+        while True:
+            start = time.time()
+            try:
+                result = f(action)
+            except Exception as ex:  # pylint: disable=broad-except
+                ms_backoff = self._retry_policy.retry_exception(ex, attempt)
+                if ms_backoff is None:
+                    self._record(index, action, kind, start, 'error')
+                    raise
+            except:  # pylint: disable=bare-except
+                self._record(index, action, kind, start, 'error')
+                raise
+            else:
+                ms_backoff = self._retry_policy.retry_result(result, attempt)
+                if ms_backoff is None:
+                    self._record(index, action, kind, start, 'ok')
+                    return
+            self._record(index, action, kind, start, 'retry')
+            attempt += 1
+            self._backoff(index, action, ms_backoff)
+            self._wait_for_probe(action, index)
+
+    def _wait_for_probe(self, action, index):
+        """Call the action's probe, if any, until it succeeds or a result
+        shared by another queue says its dependency is healthy. Retry failed
+        probes while the queue's retry policy gives a backoff.
         """
-        # Run action until either it succeeds or throws an exception
-        # that's not an ActionRetryException
-        retry = True
-        while retry:
-            retry = False
+        probe = getattr(action, 'probe', None)
+        if probe is None:
+            return
+        probe_key = getattr(action, 'probe_key', None)
+        key = None
+        if probe_key is not None and self._probe_results is not None:
+            key = probe_key()
+        attempt = 0
+        while True:
+            if key is not None and self._probe_results.is_healthy(key):
+                return
+            start = time.time()
             try:
-                f(action)
-            except ActionRetryException as ex:  # other exceptions should bubble out
-                retry = True
-                time.sleep(ex.ms_backoff / 1000.0)
+                probe()
+            except Exception as ex:  # pylint: disable=broad-except
+                ms_backoff = self._retry_policy.retry_exception(ex, attempt)
+                if ms_backoff is None:
+                    self._record(index, action, 'probe', start, 'error')
+                    raise
+            except:  # pylint: disable=bare-except
+                self._record(index, action, 'probe', start, 'error')
+                raise
+            else:
+                self._record(index, action, 'probe', start, 'ok')
+                if key is not None:
+                    self._probe_results.record(key, True)
+                return
+            self._record(index, action, 'probe', start, 'retry')
+            if key is not None:
+                self._probe_results.record(key, False)
+            attempt += 1
+            self._backoff(index, action, ms_backoff)
+
+    def _backoff(self, index, action, ms_backoff):
+        """Sleep for a retry backoff."""
+        start = time.time()
+        time.sleep(ms_backoff / 1000.0)
+        self._record(index, action, 'backoff', start, 'ok')
+
+    def _record(self, index, action, kind, start, outcome):  # pylint: disable=too-many-arguments
+        """Pass an execution event for a queued action to the recorder, if
+        any.
+        """
+        if self._recorder is not None and index is not None:
+            self._recorder.record(index, action, kind, start, time.time(), outcome)
+
+def _rollback_record_for(action):
+    """Return the object to keep for rolling back an executed action."""
+    rollback_record = getattr(action, 'rollback_record', None)
+    if rollback_record is None:
+        return action  # plain objects with execute/rollback are supported
+    record = rollback_record()
+    return action if record is None else record
@@ -1,9 +1,10 @@
 """Simple state machine to manage restrictions on action queue calls."""
 
-from enum import Enum
+class AQStateMachineStates(object):  # pylint: disable=too-few-public-methods
+    """States for state machine.
 
-class AQStateMachineStates(Enum):
-    """States for state machine."""
+    Plain class constants rather than an Enum, to keep imports minimal.
+    """
     init = 0
     add = 1
     execute = 2
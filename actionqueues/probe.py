@@ -0,0 +1,33 @@
+"""Sharing of health probe results between action queues."""
+
+import threading
+import time
+
+class ProbeResults(object):
+    """Record successful health probes so queues waiting on the same
+    dependency can re-execute without probing it themselves.
+
+    Pass the same ProbeResults object to each ActionQueue that should share
+    results. Actions opt in by returning a key naming their dependency from
+    their probe_key method. A successful probe is trusted for ms_ttl
+    milliseconds; a failed probe clears any earlier success.
+    """
+
+    def __init__(self, ms_ttl=1000):
+        """Initialise with the time for which a successful probe is trusted."""
+        self._ms_ttl = ms_ttl
+        self._healthy_until = dict()
+        self._lock = threading.Lock()
+
+    def is_healthy(self, key):
+        """Return whether a probe for key succeeded within the ttl."""
+        with self._lock:
+            return time.time() < self._healthy_until.get(key, 0)
+
+    def record(self, key, healthy):
+        """Record the result of a probe for key."""
+        with self._lock:
+            if healthy:
+                self._healthy_until[key] = time.time() + self._ms_ttl / 1000.0
+            else:
+                self._healthy_until.pop(key, None)
@@ -0,0 +1,48 @@
+"""A set of retry policies for action queues, with varying backoff
+strategies.
+"""
+
+from actionqueues.actionqueue import RetryPolicy
+
+class DoublingBackoffRetryPolicy(RetryPolicy):
+    """Retry calls raising one of a set of exceptions, or returning a value
+    matching a predicate, a number of times, doubling the backoff each time.
+
+    ActionRetryException raised by actions is also retried, with the backoff
+    it specifies, but counts towards the same number of retries.
+    """
+
+    def __init__(self, retry_on=(), retry_if=None, retries=3, ms_backoff_initial=500):
+        """Initialise the policy with a tuple of exception classes to retry,
+        an optional predicate for return values to retry, a number of
+        retries and an initial backoff.
+        """
+        self._retry_on = retry_on
+        self._retry_if = retry_if
+        self._max_retries = retries
+        self._ms_backoff_initial = ms_backoff_initial
+
+    def retry_exception(self, exception, attempt):
+        """Return a doubling backoff if exception is retriable and retries
+        remain, else None.
+        """
+        if attempt >= self._max_retries:
+            return None
+        ms_backoff = super(DoublingBackoffRetryPolicy, self).retry_exception(
+            exception, attempt)
+        if ms_backoff is None and isinstance(exception, self._retry_on):
+            ms_backoff = self._backoff(attempt)
+        return ms_backoff
+
+    def retry_result(self, result, attempt):
+        """Return a doubling backoff if result matches the retry_if predicate
+        and retries remain, else None.
+        """
+        if self._retry_if is not None and self._retry_if(result):
+            return self._backoff(attempt)
+        return None
+
+    def _backoff(self, attempt):
+        if attempt < self._max_retries:
+            return self._ms_backoff_initial * 2 ** attempt
+        return None
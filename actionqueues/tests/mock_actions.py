@@ -131,3 +131,94 @@ class State(object):
         """Increment counter value and return the new value."""
         self._counter += 1
         return self._counter
+
+class PayloadCommand(action.Action):
+    """Command holding a large payload for execute, which optionally hands
+    a compact record to the queue for rollback.
+    """
+
+    def __init__(self, rollback_state, payload_size, compact=True):
+        self._payload = bytearray(payload_size)
+        self._rollback_state = rollback_state
+        self._compact = compact
+        self._rollback_called = False
+        self._rollback_value = self._rollback_state.peek()
+        self.record = None
+
+    def execute(self):
+        self.record = PayloadRollbackRecord(self._rollback_state)
+
+    def rollback(self):
+        self._rollback_called = True
+        self._rollback_value = self._rollback_state.inc()
+
+    def rollback_record(self):
+        return self.record if self._compact else None
+
+class PayloadRollbackRecord(object):
+    """Compact rollback record for PayloadCommand."""
+
+    __slots__ = ('rollback_state', 'rollback_called', 'rollback_value')
+
+    def __init__(self, rollback_state):
+        self.rollback_state = rollback_state
+        self.rollback_called = False
+        self.rollback_value = None
+
+    def rollback(self):
+        """Record the rollback."""
+        self.rollback_called = True
+        self.rollback_value = self.rollback_state.inc()
+
+class ProbedCommand(action.Action):
+    """Command that fails execute with a retry exception a number of times,
+    and whose probe fails a number of times before succeeding.
+    """
+
+    def __init__(self, failures, probe_failures, key=None):
+        self._failures = failures
+        self._probe_failures = probe_failures
+        self._key = key
+        self.execute_calls = 0
+        self.probe_calls = 0
+
+    def execute(self):
+        self.execute_calls += 1
+        self._failures -= 1
+        if self._failures >= 0:
+            raise actionqueue.ActionRetryException()
+
+    def probe(self):
+        self.probe_calls += 1
+        self._probe_failures -= 1
+        if self._probe_failures >= 0:
+            raise actionqueue.ActionRetryException()
+
+    def probe_key(self):
+        return self._key
+
+class FlakyCommand(action.Action):
+    """Command whose execute and rollback return or raise the values given,
+    in turn, recording how many times each was called.
+    """
+
+    def __init__(self, execute_outcomes, rollback_outcomes=()):
+        self._execute_outcomes = list(execute_outcomes)
+        self._rollback_outcomes = list(rollback_outcomes)
+        self.execute_calls = 0
+        self.rollback_calls = 0
+
+    def execute(self):
+        self.execute_calls += 1
+        return self._outcome(self._execute_outcomes)
+
+    def rollback(self):
+        self.rollback_calls += 1
+        return self._outcome(self._rollback_outcomes)
+
+    @staticmethod
+    def _outcome(outcomes):
+        outcome = outcomes.pop(0) if outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
@@ -0,0 +1,78 @@
+# pylint: disable=invalid-name,missing-docstring
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import actionqueues
+
+# Cumulative import time of the package, including anything it imports.
+# Measured at about 1.5ms on Python 3.11 when bytecode isn't cached, and
+# 0.1ms when it is; importing even a few stdlib modules exceeds this.
+IMPORT_BUDGET_US = 5000
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+def _run_python(*args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in [PACKAGE_ROOT, env.get('PYTHONPATH')] if p)
+    return subprocess.check_output(
+        (sys.executable,) + args,
+        cwd=PACKAGE_ROOT,
+        env=env,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+
+def test_import_loads_no_other_modules():
+    out = _run_python('-c', (
+        'import sys\n'
+        'before = set(sys.modules)\n'
+        'import actionqueues\n'
+        'print(",".join(sorted(set(sys.modules) - before)))\n'
+    ))
+    assert out.strip() == 'actionqueues'
+
+LAZY_IMPORT = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="module __getattr__ needs Python 3.7+")
+
+@LAZY_IMPORT
+def test_submodules_load_lazily():
+    for name in actionqueues._SUBMODULES:  # pylint: disable=protected-access
+        out = _run_python('-c', (
+            'import sys\n'
+            'import actionqueues\n'
+            'name = "actionqueues.%s"\n'
+            'print(name in sys.modules)\n'
+            'print(actionqueues.%s.__name__ == name)\n'
+            'print(name in sys.modules)\n'
+        ) % (name, name))
+        assert out.split() == ['False', 'True', 'True']
+
+@LAZY_IMPORT
+def test_dir_lists_submodules():
+    for name in actionqueues._SUBMODULES:  # pylint: disable=protected-access
+        assert name in dir(actionqueues)
+
+@LAZY_IMPORT
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        actionqueues.not_a_submodule  # pylint: disable=pointless-statement
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs -X importtime")
+def test_import_time_benchmark():
+    # Take the best of a few runs, to ignore noise from the machine
+    best_us = min(_import_time_us() for _ in range(3))
+    assert best_us < IMPORT_BUDGET_US
+
+def _import_time_us():
+    out = _run_python('-X', 'importtime', '-c', 'import actionqueues')
+    for line in out.splitlines():
+        fields = [f.strip() for f in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'actionqueues':
+            return int(fields[1])
+    raise AssertionError('actionqueues not in -X importtime output:\n' + out)
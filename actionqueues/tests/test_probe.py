@@ -0,0 +1,64 @@
+# pylint: disable=invalid-name,missing-docstring
+
+import pytest
+
+from actionqueues import actionqueue
+from actionqueues.probe import ProbeResults
+from .mock_actions import (
+    ExplodingCommand,
+    ProbedCommand
+)
+
+def test_probe_before_reexecute():
+    action = ProbedCommand(failures=2, probe_failures=3)
+    q = actionqueue.ActionQueue()
+    q.add(action)
+    q.execute()
+
+    assert action.execute_calls == 3
+    assert action.probe_calls == 5  # 3 failures, then 1 success per retry
+
+def test_probe_not_called_without_retry():
+    action = ProbedCommand(failures=0, probe_failures=0)
+    q = actionqueue.ActionQueue()
+    q.add(action)
+    q.execute()
+
+    assert action.execute_calls == 1
+    assert action.probe_calls == 0
+
+def test_probe_exception_fails_execute():
+    action = ProbedCommand(failures=1, probe_failures=0)
+    action.probe = ExplodingCommand().execute
+    q = actionqueue.ActionQueue()
+    q.add(action)
+
+    with pytest.raises(IOError):
+        q.execute()
+    assert action.execute_calls == 1
+
+def test_shared_probe_results():
+    results = ProbeResults(ms_ttl=60000)
+    first = ProbedCommand(failures=1, probe_failures=2, key='db')
+    second = ProbedCommand(failures=1, probe_failures=2, key='db')
+    other = ProbedCommand(failures=1, probe_failures=0, key='cache')
+    for action in [first, second, other]:
+        q = actionqueue.ActionQueue(probe_results=results)
+        q.add(action)
+        q.execute()
+
+    assert first.probe_calls == 3
+    assert second.probe_calls == 0
+    assert second.execute_calls == 2
+    assert other.probe_calls == 1
+
+def test_probe_results_expire():
+    results = ProbeResults(ms_ttl=0)
+    results.record('db', True)
+    assert not results.is_healthy('db')
+
+    results = ProbeResults(ms_ttl=60000)
+    results.record('db', True)
+    assert results.is_healthy('db')
+    results.record('db', False)
+    assert not results.is_healthy('db')
@@ -0,0 +1,122 @@
+# pylint: disable=invalid-name,missing-docstring
+
+import pytest
+
+from actionqueues import actionqueue
+from actionqueues.actionqueue import ActionRetryException, RetryPolicy
+from actionqueues.retrypolicy import DoublingBackoffRetryPolicy
+from .mock_actions import (
+    FlakyCommand,
+    RetryCommand,
+    State
+)
+
+def test_RetryPolicy_defaults():
+    policy = RetryPolicy()
+    assert policy.retry_exception(ActionRetryException(), 0) == 0
+    assert policy.retry_exception(ActionRetryException(ms_backoff=20), 100) == 20
+    assert policy.retry_exception(IOError(), 0) is None
+    assert policy.retry_result(False, 0) is None
+
+def test_DoublingBackoffRetryPolicy_defaults():
+    policy = DoublingBackoffRetryPolicy(retry_on=(IOError,))
+
+    assert [policy.retry_exception(IOError(), a) for a in range(5)] == [
+        500, 1000, 2000, None, None]
+    assert policy.retry_exception(ZeroDivisionError(), 0) is None
+    assert policy.retry_exception(ActionRetryException(10), 2) == 10
+    assert policy.retry_exception(ActionRetryException(10), 3) is None
+    assert policy.retry_result(False, 0) is None
+
+def test_DoublingBackoffRetryPolicy_custom():
+    policy = DoublingBackoffRetryPolicy(
+        retry_on=(IOError, ValueError),
+        retry_if=lambda result: result is False,
+        retries=4,
+        ms_backoff_initial=100
+    )
+
+    assert [policy.retry_exception(ValueError(), a) for a in range(5)] == [
+        100, 200, 400, 800, None]
+    assert [policy.retry_result(False, a) for a in range(5)] == [
+        100, 200, 400, 800, None]
+    assert policy.retry_result(True, 0) is None
+    assert policy.retry_result(None, 0) is None
+
+def test_queue_retries_exceptions():
+    policy = DoublingBackoffRetryPolicy(
+        retry_on=(IOError,), retries=2, ms_backoff_initial=0)
+    actions = [
+        FlakyCommand([IOError(), IOError()]),
+        FlakyCommand([IOError(), IOError(), IOError()]),
+    ]
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    for action in actions:
+        q.add(action)
+
+    with pytest.raises(IOError):
+        q.execute()
+    assert actions[0].execute_calls == 3
+    assert actions[1].execute_calls == 3
+
+def test_queue_retries_results():
+    policy = DoublingBackoffRetryPolicy(
+        retry_if=lambda result: result == 'busy', retries=5, ms_backoff_initial=0)
+    action = FlakyCommand(
+        ['busy', 'busy', 'done'],
+        rollback_outcomes=['busy', ZeroDivisionError(), 'busy']
+    )
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    q.add(action)
+    q.execute()
+    q.rollback()
+
+    assert action.execute_calls == 3
+    assert action.rollback_calls == 2  # the exception isn't retried
+
+def test_policy_shared_between_actions():
+    # Retry counts are per call, not per policy
+    policy = DoublingBackoffRetryPolicy(
+        retry_on=(IOError,), retries=1, ms_backoff_initial=0)
+    actions = [FlakyCommand([IOError()]) for _ in range(3)]
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    for action in actions:
+        q.add(action)
+    q.execute()
+
+    assert [a.execute_calls for a in actions] == [2, 2, 2]
+
+def test_action_retry_exception_with_policy():
+    policy = DoublingBackoffRetryPolicy(retries=5)
+    action = RetryCommand(State(), 5)
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    q.add(action)
+    q.execute()
+
+    assert action._execute_value == 6  # pylint: disable=protected-access
+
+def test_action_retry_exception_limited_by_policy():
+    policy = DoublingBackoffRetryPolicy(retries=2)
+    action = RetryCommand(State(), 5)
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    q.add(action)
+
+    with pytest.raises(ActionRetryException):
+        q.execute()
+    assert action._execute_value == 3  # pylint: disable=protected-access
+
+def test_policy_limits_probes():
+    policy = DoublingBackoffRetryPolicy(
+        retry_on=(IOError,), retries=2, ms_backoff_initial=0)
+    action = FlakyCommand([IOError(), IOError()])
+    probe_outcomes = [IOError(), IOError(), None, IOError(), IOError(), IOError()]
+    action.probe = lambda: FlakyCommand._outcome(probe_outcomes)  # pylint: disable=protected-access
+    q = actionqueue.ActionQueue(retry_policy=policy)
+    q.add(action)
+
+    # The first probe is retried twice then succeeds; the second gives up
+    # after its own two retries, with the probe's exception.
+    with pytest.raises(IOError):
+        q.execute()
+    assert action.execute_calls == 2
+    assert probe_outcomes == []
@@ -0,0 +1,83 @@
+# pylint: disable=invalid-name,missing-docstring,protected-access
+
+import gc
+import weakref
+
+import pytest
+
+from actionqueues import actionqueue
+from .mock_actions import (
+    MockCommand,
+    ExplodingCommand,
+    PayloadCommand,
+    State
+)
+
+PAYLOAD_SIZE = 64 * 1024
+
+def test_rollback_uses_record():
+    exec_state = State()
+    rollback_state = State()
+    actions = [
+        MockCommand(exec_state, rollback_state),
+        PayloadCommand(rollback_state, PAYLOAD_SIZE),
+        PayloadCommand(rollback_state, PAYLOAD_SIZE, compact=False),
+        ExplodingCommand()
+    ]
+    q = actionqueue.ActionQueue()
+    for action in actions:
+        q.add(action)
+
+    with pytest.raises(IOError):
+        q.execute()
+    q.rollback()
+
+    assert actions[3]._rollback_called
+    assert actions[2]._rollback_called
+    assert actions[2]._rollback_value == 1
+    assert not actions[1]._rollback_called
+    assert actions[1].record.rollback_called
+    assert actions[1].record.rollback_value == 2
+    assert actions[0]._rollback_called
+    assert actions[0]._rollback_value == 3
+
+def test_compacted_actions_are_released():
+    rollback_state = State()
+    q = actionqueue.ActionQueue()
+    refs = []
+    for _ in range(10):
+        action = PayloadCommand(rollback_state, PAYLOAD_SIZE)
+        refs.append(weakref.ref(action))
+        q.add(action)
+    del action
+
+    q.execute()
+    gc.collect()
+
+    assert all(ref() is None for ref in refs)
+
+    q.rollback()
+    assert rollback_state.peek() == 10
+
+def _retained_bytes(compact, count=200):
+    tracemalloc = pytest.importorskip("tracemalloc")
+    rollback_state = State()
+    tracemalloc.start()
+    try:
+        q = actionqueue.ActionQueue()
+        for _ in range(count):
+            q.add(PayloadCommand(rollback_state, PAYLOAD_SIZE, compact=compact))
+        q.execute()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return retained
+
+def test_rollback_record_memory_benchmark():
+    full = _retained_bytes(compact=False)
+    compact = _retained_bytes(compact=True)
+
+    # Full actions retain every payload; compacted queues retain only records
+    assert full > 200 * PAYLOAD_SIZE
+    assert compact < full / 100
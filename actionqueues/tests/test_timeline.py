@@ -0,0 +1,149 @@
+# pylint: disable=invalid-name,missing-docstring
+
+import pytest
+
+from actionqueues import actionqueue, timeline
+from .mock_actions import (
+    MockCommand,
+    ExplodingCommand,
+    PayloadCommand,
+    ProbedCommand,
+    RetryCommand,
+    State
+)
+
+def _run(actions, run=None):
+    recorder = timeline.TimelineRecorder(run=run)
+    q = actionqueue.ActionQueue(recorder=recorder)
+    for action in actions:
+        q.add(action)
+    try:
+        q.execute()
+    except IOError:
+        q.rollback()
+    return recorder
+
+def test_records_events():
+    exec_state = State()
+    rollback_state = State()
+    recorder = _run([
+        MockCommand(exec_state, rollback_state),
+        RetryCommand(exec_state, 2, delay_ms=10),
+        ProbedCommand(failures=1, probe_failures=1),
+        PayloadCommand(rollback_state, 16),
+        ExplodingCommand()
+    ])
+
+    assert [(e.index, e.kind, e.outcome) for e in recorder.events] == [
+        (0, 'execute', 'ok'),
+        (1, 'execute', 'retry'),
+        (1, 'backoff', 'ok'),
+        (1, 'execute', 'retry'),
+        (1, 'backoff', 'ok'),
+        (1, 'execute', 'ok'),
+        (2, 'execute', 'retry'),
+        (2, 'backoff', 'ok'),
+        (2, 'probe', 'retry'),
+        (2, 'backoff', 'ok'),
+        (2, 'probe', 'ok'),
+        (2, 'execute', 'ok'),
+        (3, 'execute', 'ok'),
+        (4, 'execute', 'error'),
+        (4, 'rollback', 'ok'),
+        (3, 'rollback', 'ok'),
+        (2, 'rollback', 'ok'),
+        (1, 'rollback', 'ok'),
+        (0, 'rollback', 'ok'),
+    ]
+    # Rollback of a compact record keeps the action's label
+    assert [e.label for e in recorder.events if e.index == 3] == ['PayloadCommand'] * 2
+
+def test_summaries():
+    recorder = _run([
+        MockCommand(State(), State()),
+        RetryCommand(State(), 2, delay_ms=20),
+    ])
+
+    summaries = timeline.summarise(recorder.events)
+    assert [s.label for s in summaries] == ['MockCommand', 'RetryCommand']
+    assert summaries[1].retries == 2
+    assert summaries[1].backoff >= 0.04
+    assert summaries[1].total >= summaries[1].backoff
+
+    path = timeline.critical_path(recorder.events)
+    assert [s.label for s in path] == ['RetryCommand', 'MockCommand']
+
+def test_dump_load_aggregate(tmpdir):
+    events = str(tmpdir.join('events.jsonl'))
+    with open(events, 'w') as fp:
+        for run in range(3):
+            recorder = _run([
+                MockCommand(State(), State()),
+                RetryCommand(State(), run, delay_ms=5),
+            ], run=run)
+            recorder.dump(fp)
+
+    with open(events) as fp:
+        runs = timeline.load_runs(fp)
+    assert list(runs) == [0, 1, 2]
+    combined = timeline.aggregate(runs.values())
+    assert [s.label for s in combined] == ['RetryCommand', 'MockCommand']
+    assert combined[0].runs == 3
+    assert combined[0].retries == 3
+    assert combined[0].backoff == pytest.approx(
+        sum(e.duration for events in runs.values() for e in events if e.kind == 'backoff'))
+
+def test_aggregate_counts_runs_once_per_label():
+    exec_state = State()
+    rollback_state = State()
+    runs = [
+        _run([MockCommand(exec_state, rollback_state) for _ in range(4)]).events
+        for _ in range(3)
+    ]
+
+    combined = timeline.aggregate(runs)
+    assert [(s.label, s.runs) for s in combined] == [('MockCommand', 3)]
+
+def test_render(tmpdir):
+    recorder = _run([
+        MockCommand(State(), State()),
+        RetryCommand(State(), 1, delay_ms=5),
+        ExplodingCommand()
+    ], run='r<1>')
+
+    svg = timeline.render_svg(recorder.events)
+    assert svg.startswith('<svg')
+    assert svg.count('<rect') == len(recorder.events)
+    assert 'stroke=' in svg  # the exploding execute
+
+    events = str(tmpdir.join('events.jsonl'))
+    with open(events, 'w') as fp:
+        recorder.dump(fp)
+    with open(events) as fp:
+        html = timeline.render_html(timeline.load_runs(fp))
+    assert 'r&lt;1&gt;' in html
+    assert '<table>' in html
+
+def test_main(tmpdir, capsys):
+    events = tmpdir.join('events.jsonl')
+    output = tmpdir.join('timeline.html')
+    recorder = _run([RetryCommand(State(), 1)])
+    with open(str(events), 'w') as fp:
+        recorder.dump(fp)
+
+    timeline.main([str(events), '-o', str(output)])
+
+    assert 'RetryCommand' in capsys.readouterr().out
+    assert '<svg' in output.read()
+
+def test_direct_calls_not_recorded():
+    recorder = timeline.TimelineRecorder()
+    q = actionqueue.ActionQueue(recorder=recorder)
+    q.add(MockCommand(State(), State()))
+    q.execute()
+    action = RetryCommand(State(), 1)
+    q.execute_with_retries(action, lambda a: a.execute())
+
+    assert action._execute_value == 2  # pylint: disable=protected-access
+    assert [(e.index, e.label) for e in recorder.events] == [(0, 'MockCommand')]
+    assert '<svg' in timeline.render_svg(recorder.events)
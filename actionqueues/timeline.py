@@ -0,0 +1,257 @@
+"""Recording, summarising and rendering timelines of queue executions.
+
+Pass a TimelineRecorder to an ActionQueue to record an Event for each
+execute, rollback and probe call and each retry backoff. Recorded runs can
+be dumped as JSON lines, then summarised and rendered as an SVG or HTML
+timeline, either in code or using:
+
+    python -m actionqueues.timeline events.jsonl -o timeline.html
+"""
+
+import argparse
+import json
+import sys
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
+KINDS = ('execute', 'rollback', 'probe', 'backoff')
+
+COLOURS = {
+    'execute': '#4c78a8',
+    'rollback': '#f58518',
+    'probe': '#54a24b',
+    'backoff': '#bab0ac',
+}
+
+ERROR_COLOUR = '#e45756'
+
+class Event(object):
+    """A single call made by the queue for an action."""
+
+    __slots__ = ('run', 'index', 'label', 'kind', 'start', 'end', 'outcome')
+
+    def __init__(self, run, index, label, kind, start, end, outcome):  # pylint: disable=too-many-arguments
+        self.run = run
+        self.index = index
+        self.label = label
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.outcome = outcome
+
+    @property
+    def duration(self):
+        """Duration of the event in seconds."""
+        return self.end - self.start
+
+    def to_dict(self):
+        """Return the event as a dict, for serialising."""
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    @classmethod
+    def from_dict(cls, d):
+        """Create an event from a dict made by to_dict."""
+        return cls(*[d[name] for name in cls.__slots__])
+
+class TimelineRecorder(object):
+    """Records the events of an ActionQueue run."""
+
+    def __init__(self, run=None):
+        """Initialise with an identifier for the run, used when recording
+        several runs to a single file.
+        """
+        self.run = run
+        self.events = list()
+        self._labels = dict()
+
+    def record(self, index, action, kind, start, end, outcome):  # pylint: disable=too-many-arguments
+        """Record an event. Called by the ActionQueue."""
+        # Rollback may be called on a rollback record rather than the action,
+        # so keep the label from the action's first event.
+        label = self._labels.get(index)
+        if label is None:
+            label = self._labels[index] = _label_for(action)
+        self.events.append(Event(self.run, index, label, kind, start, end, outcome))
+
+    def dump(self, fp):
+        """Write the recorded events to file-like fp as JSON lines."""
+        for event in self.events:
+            fp.write(json.dumps(event.to_dict()) + '\n')
+
+def load_runs(fp):
+    """Read events written by TimelineRecorder.dump from file-like fp.
+
+    Returns an OrderedDict of run to list of events.
+    """
+    runs = OrderedDict()
+    for line in fp:
+        if line.strip():
+            event = Event.from_dict(json.loads(line))
+            runs.setdefault(event.run, list()).append(event)
+    return runs
+
+class ActionSummary(object):  # pylint: disable=too-many-instance-attributes
+    """Time spent on one action, or on one label across many runs."""
+
+    def __init__(self, index, label):
+        self.index = index
+        self.label = label
+        self.runs = 0
+        self.total = 0.0
+        self.retries = 0
+        self.errors = 0
+        self.times = dict((kind, 0.0) for kind in KINDS)
+
+    @property
+    def backoff(self):
+        """Time spent in retry backoff, in seconds."""
+        return self.times['backoff']
+
+    def add(self, event):
+        """Add the time of an event for this action."""
+        self.times[event.kind] = self.times.get(event.kind, 0.0) + event.duration
+        self.total += event.duration
+        if event.outcome == 'retry' and event.kind != 'probe':
+            self.retries += 1
+        elif event.outcome == 'error':
+            self.errors += 1
+
+def summarise(events):
+    """Return an ActionSummary for each action in a run, in queue order."""
+    summaries = dict()
+    for event in events:
+        summary = summaries.get(event.index)
+        if summary is None:
+            summary = summaries[event.index] = ActionSummary(event.index, event.label)
+            summary.runs = 1
+        summary.add(event)
+    return [summaries[index] for index in sorted(summaries)]
+
+def critical_path(events):
+    """Return the ActionSummary of each action in a run, longest first.
+
+    Actions in a queue run one after another, so every action is on the
+    critical path and each adds its total time to the run's latency.
+    """
+    return sorted(summarise(events), key=lambda s: s.total, reverse=True)
+
+def aggregate(runs):
+    """Combine the summaries of many runs by action label, longest first.
+
+    runs is an iterable of lists of events, such as the values returned by
+    load_runs. Each ActionSummary's runs attribute counts the runs including
+    the label, and its index is None.
+    """
+    combined = OrderedDict()
+    for events in runs:
+        counted = set()
+        for summary in summarise(events):
+            total = combined.get(summary.label)
+            if total is None:
+                total = combined[summary.label] = ActionSummary(None, summary.label)
+            if summary.label not in counted:
+                counted.add(summary.label)
+                total.runs += 1
+            total.total += summary.total
+            total.retries += summary.retries
+            total.errors += summary.errors
+            for kind, duration in summary.times.items():
+                total.times[kind] = total.times.get(kind, 0.0) + duration
+    return sorted(combined.values(), key=lambda s: s.total, reverse=True)
+
+def render_svg(events, width=800, row_height=20):
+    """Render a Gantt-style SVG timeline of a run's events.
+
+    Each action gets a row, with a bar for each event coloured by kind.
+    Events which raised an exception are outlined in red.
+    """
+    label_width = 160
+    rows = [(s.index, s.label) for s in summarise(events)]
+    row_for = dict((index, i) for i, (index, _) in enumerate(rows))
+    origin = min(e.start for e in events) if events else 0.0
+    span = max(e.end for e in events) - origin if events else 0.0
+    scale = (width - label_width) / span if span > 0 else 0.0
+    height = row_height * (len(rows) + 1)
+
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" '
+        'font-family="sans-serif" font-size="12">' % (width, height)
+    ]
+    for i, (index, label) in enumerate(rows):
+        parts.append('<text x="4" y="%d">%d: %s</text>' % (
+            row_height * i + row_height - 6, index, escape(label)))
+    for event in events:
+        parts.append(
+            '<rect x="%.2f" y="%d" width="%.2f" height="%d" fill="%s"%s>'
+            '<title>%s %s (%s) %.1fms</title></rect>' % (
+                label_width + (event.start - origin) * scale,
+                row_height * row_for[event.index] + 2,
+                max(event.duration * scale, 1.0),
+                row_height - 4,
+                COLOURS.get(event.kind, ERROR_COLOUR),
+                ' stroke="%s"' % ERROR_COLOUR if event.outcome == 'error' else '',
+                escape(event.label), event.kind, event.outcome,
+                event.duration * 1000.0,
+            ))
+    parts.append('<text x="%d" y="%d">%.1fms</text>' % (
+        label_width, height - 6, span * 1000.0))
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+def _summary_table(summaries):
+    rows = [
+        '<tr><th>Action</th><th>Runs</th><th>Total ms</th><th>Backoff ms</th>'
+        '<th>Probe ms</th><th>Retries</th><th>Errors</th></tr>'
+    ]
+    for s in summaries:
+        rows.append(
+            '<tr><td>%s</td><td>%d</td><td>%.1f</td><td>%.1f</td>'
+            '<td>%.1f</td><td>%d</td><td>%d</td></tr>' % (
+                escape(s.label), s.runs, s.total * 1000.0, s.backoff * 1000.0,
+                s.times['probe'] * 1000.0, s.retries, s.errors,
+            ))
+    return '<table>\n%s\n</table>' % '\n'.join(rows)
+
+def render_html(runs):
+    """Render an HTML report for runs, an OrderedDict of run to events.
+
+    The report shows the timeline of the slowest run, and the time spent on
+    each action label across all runs.
+    """
+    slowest = max(runs, key=lambda run: _span(runs[run])) if runs else None
+    return '\n'.join([
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8"><title>actionqueues timeline</title>',
+        '<style>body{font-family:sans-serif} td,th{padding:2px 8px;text-align:right}'
+        ' td:first-child{text-align:left}</style></head><body>',
+        '<h1>Slowest run: %s</h1>' % escape(str(slowest)),
+        render_svg(runs[slowest]) if runs else '',
+        '<h1>Time by action across %d runs</h1>' % len(runs),
+        _summary_table(aggregate(runs.values())),
+        '</body></html>',
+    ])
+
+def _span(events):
+    return max(e.end for e in events) - min(e.start for e in events)
+
+def _label_for(action):
+    return getattr(action, 'name', None) or type(action).__name__
+
+def main(argv=None):
+    """Summarise recorded runs, optionally writing an HTML report."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('events', help='JSON lines file from TimelineRecorder.dump')
+    parser.add_argument('-o', '--output', help='write an HTML report to this file')
+    args = parser.parse_args(argv)
+
+    with open(args.events) as fp:
+        runs = load_runs(fp)
+    for s in aggregate(runs.values()):
+        sys.stdout.write('%-30s runs=%d total=%.1fms backoff=%.1fms retries=%d\n' % (
+            s.label, s.runs, s.total * 1000.0, s.backoff * 1000.0, s.retries))
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(render_html(runs))
+
+if __name__ == '__main__':
+    main()